@@ -1,52 +1,213 @@
-import itertools
+import functools
+import hashlib
 import logging
-import re
+import os
+import shutil
+import tempfile
+from importlib import metadata
 from pathlib import Path, PurePath
+from xml.etree import ElementTree
 from zipfile import ZipFile
 
 import mdformat
-from bs4 import BeautifulSoup
-from markdown import markdown
+from lxml import etree, html as lhtml
+from markdown import Markdown, markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
 
 README = "README.md"
+README_CACHE_VERSION = 1  # increment whenever a change to the conversion pipeline changes the html it produces
+# upgrading any of the rendering libraries can change the html too, so their versions are part of every cache key
+README_CACHE_SALT = f"{README_CACHE_VERSION}|{metadata.version('Markdown')}|{etree.LXML_VERSION}|{mdformat.__version__}".encode()
+TABLE_CELL_STYLE = "border:1px solid #FFFFFF; padding:0.5em;"
+TABLE_ROW_STYLES = ("background-color: #000000; border:1px solid #FFFFFF;", "background-color: #1C1C1E; border:1px solid #FFFFFF;")
 
 
-def apply_styles_to_table(soup: BeautifulSoup) -> BeautifulSoup:
+def apply_styles_to_table(root: lhtml.HtmlElement) -> lhtml.HtmlElement:
     """Style tables for better legibility"""
-    colors = itertools.cycle(["#000000", "#1C1C1E"])
-    for html_table in soup.find_all("table"):
-        for col in html_table.find_all("td"):
-            col["style"] = "border:1px solid #FFFFFF; padding:0.5em;"
-        for row in html_table.find_all("tr"):
-            row["style"] = f"background-color: {next(colors)}; border:1px solid #FFFFFF;"
-    return soup
-
-
-def replace_images_with_link(soup: BeautifulSoup, no_images: bool) -> BeautifulSoup:
-    """Replace all images with boilerplate text"""
-    for img in soup.find_all("img"):
-        link_url = img.parent.get("href") if img.parent.get("href") else img.get("src")
-        new_tag = soup.new_tag("a", href=link_url)
-        new_tag.string = "" if no_images else img.get("alt", "[IMG]")
-        img.replace_with(new_tag)
-    return soup
-
-
-def readme_html(readme: ZipFile, no_images: bool = False) -> str:
+    for index, row in enumerate(root.iter("tr")):
+        row.attrib["style"] = TABLE_ROW_STYLES[index & 1]
+    for cell in root.iter("td"):
+        cell.attrib["style"] = TABLE_CELL_STYLE
+    return root
+
+
+class ImagesToLinks(Treeprocessor):
+    """Replaces markdown images with links while the document is rendered, dropping relative images without alt text"""
+
+    REMOVABLE_BLOCKS = frozenset({"p", "h1", "h2", "h3", "h4", "h5", "h6"})
+
+    def __init__(self, md: Markdown, no_images: bool) -> None:
+        super().__init__(md)
+        self.no_images = no_images
+
+    def run(self, root: ElementTree.Element) -> None:
+        parents = {child: parent for parent in root.iter() for child in parent}
+        for img in [element for element in parents if element.tag == "img"]:
+            parent = parents[img]
+            index = list(parent).index(img)
+            src = img.get("src", "")
+            label = "" if self.no_images else img.get("alt", "[IMG]")
+            if not img.get("alt") and src.startswith("."):
+                self.remove_image(parent, index)
+                if parent.tag == "a" and self.is_empty(parent):
+                    parent = self.remove_from_parent(parents, parent)  # the link only held the image
+                if parent.tag in self.REMOVABLE_BLOCKS and self.is_empty(parent):
+                    self.remove_from_parent(parents, parent)  # the block only held the image, cells and list items keep their place
+            elif parent.tag == "a":
+                img.tail = label + (img.tail or "")
+                self.remove_keeping_tail(parent, index)
+            else:
+                new_tag = ElementTree.Element("a", href=src)
+                new_tag.text = label
+                new_tag.tail = img.tail
+                parent[index] = new_tag
+
+    def remove_from_parent(self, parents: dict[ElementTree.Element, ElementTree.Element], element: ElementTree.Element) -> ElementTree.Element:
+        """Remove an emptied element the same way as an image, returning the parent it was removed from"""
+        parent = parents[element]
+        self.remove_image(parent, list(parent).index(element))
+        return parent
+
+    def remove_image(self, parent: ElementTree.Element, index: int) -> None:
+        """Remove an image along with the line break or whitespace that only existed to separate it from the text around it"""
+        if self.fills_line(parent, index):
+            self.remove_keeping_tail(parent, index + 1)  # the line break that followed the image
+            self.remove_keeping_tail(parent, index)
+            return
+        starts_block = index == 0 and not (parent.text or "").strip()
+        ends_block = index + 1 == len(parent) and not (parent[index].tail or "").strip()
+        self.remove_keeping_tail(parent, index)
+        if starts_block:
+            parent.text = (parent.text or "").lstrip()
+        if not ends_block:
+            return
+        hard_break = bool(index) and parent[index - 1].tag == "br"
+        if hard_break:
+            self.remove_keeping_tail(parent, index - 1)  # the line break that led into the image
+        if len(parent):
+            parent[-1].tail = self.strip_end(parent[-1].tail, hard_break)
+        else:
+            parent.text = self.strip_end(parent.text, hard_break)
+
+    @staticmethod
+    def is_empty(element: ElementTree.Element) -> bool:
+        """Check whether an element has neither children nor any text of its own"""
+        return not len(element) and not (element.text or "").strip()
+
+    @staticmethod
+    def strip_end(text: str | None, hard_break: bool) -> str:
+        """Trim the whitespace left at the end of a block, and the backslash mdformat uses to mark a hard break if one was removed"""
+        text = (text or "").rstrip()
+        return text.removesuffix("\\").rstrip() if hard_break else text
+
+    @staticmethod
+    def fills_line(parent: ElementTree.Element, index: int) -> bool:
+        """Check whether a child element is alone on its line, between the start of its parent or a line break and a line break"""
+        preceding_text = parent[index - 1].tail if index else parent.text
+        starts_line = index == 0 or parent[index - 1].tag == "br"
+        ends_line = index + 1 < len(parent) and parent[index + 1].tag == "br"
+        return starts_line and ends_line and not (preceding_text or "").strip() and not (parent[index].tail or "").strip()
+
+    @staticmethod
+    def remove_keeping_tail(parent: ElementTree.Element, index: int) -> None:
+        """Remove a child element, moving any text that followed it onto the previous sibling or the parent"""
+        tail = parent[index].tail or ""
+        if index:
+            parent[index - 1].tail = (parent[index - 1].tail or "") + tail
+        else:
+            parent.text = (parent.text or "") + tail
+        del parent[index]
+
+
+class ImagesToLinksExtension(Extension):
+    """Registers ImagesToLinks to run after inline markdown (including images) has been parsed"""
+
+    def __init__(self, no_images: bool = False) -> None:
+        super().__init__()
+        self.no_images = no_images
+
+    def extendMarkdown(self, md: Markdown) -> None:
+        md.treeprocessors.register(ImagesToLinks(md, self.no_images), "images_to_links", 15)
+
+
+def replace_images_with_link(root: lhtml.HtmlElement, no_images: bool) -> lhtml.HtmlElement:
+    """Replace images found in raw html with links labelled by their alt text, or label the link already wrapping them"""
+    for img in list(root.iter("img")):
+        parent = img.getparent()
+        label = "" if no_images else img.get("alt", "[IMG]")
+        if parent.tag == "a":
+            img.tail = label + (img.tail or "")
+            img.drop_tree()  # the label and any following text stay inside the existing link
+            continue
+        new_tag = lhtml.Element("a", href=img.get("src"))
+        new_tag.text = label
+        new_tag.tail = img.tail
+        parent.replace(img, new_tag)
+    return root
+
+
+def readme_cache_dir() -> Path:
+    """Returns the folder where rendered README html is stored between runs, honoring XDG_CACHE_HOME"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home, "fg-forge-updater", "readme")
+
+
+def convert_readme(markdown_text: str, no_images: bool = False, normalize: bool = False) -> str:
+    """returns an html-formatted string, optionally canonicalizing the markdown with mdformat first"""
+    if normalize:
+        markdown_text = mdformat.text(markdown_text)
+    html = markdown(markdown_text, extensions=["extra", "nl2br", "smarty", ImagesToLinksExtension(no_images)])
+    root = lhtml.fragment_fromstring(html, create_parent="div")
+    root = replace_images_with_link(root, no_images)
+    root = apply_styles_to_table(root)
+    return lhtml.tostring(root, encoding="unicode")[5:-6]  # strip the wrapping <div></div>
+
+
+@functools.lru_cache
+def cached_convert_readme(markdown_text: str, no_images: bool = False, normalize: bool = False) -> str:
+    """Returns the html previously rendered from identical markdown if found on disk, otherwise converts it and stores the result"""
+    key = hashlib.blake2b(markdown_text.encode("UTF-8") + bytes([no_images, normalize]) + README_CACHE_SALT).hexdigest()
+    cached_file = Path(readme_cache_dir(), f"{key}.html")
+    try:
+        html = cached_file.read_text(encoding="UTF-8")
+        logging.info("Using cached README html from %s", cached_file)
+        return html
+    except FileNotFoundError:
+        pass
+    except (OSError, UnicodeDecodeError):
+        logging.warning("Unable to read cached README html at %s, converting again", cached_file)
+
+    html = convert_readme(markdown_text, no_images, normalize)
+    try:
+        cached_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="UTF-8", dir=cached_file.parent, suffix=".tmp", delete=False) as temp_file:
+            temp_file.write(html)
+        os.replace(temp_file.name, cached_file)  # an interrupted run can't leave a truncated file behind for later runs to serve
+    except OSError:
+        logging.warning("Unable to cache README html at %s", cached_file)
+    return html
+
+
+def clear_cache() -> None:
+    """Forget all README html rendered by previous calls and previous runs"""
+    cached_convert_readme.cache_clear()
+    shutil.rmtree(readme_cache_dir(), ignore_errors=True)
+
+
+def readme_html(readme: ZipFile, no_images: bool = False, normalize: bool = False) -> str:
     """returns an html-formatted string"""
     markdown_text = readme.read(README).decode("UTF-8")
-    markdown_text = re.sub(r"!\[]\(\..+?\)", "", markdown_text)
-    markdown_text = mdformat.text(markdown_text)
-    html = markdown(markdown_text, extensions=["extra", "nl2br", "smarty"])
-    soup = BeautifulSoup(html, "html.parser")
-    soup = replace_images_with_link(soup, no_images)
-    soup = apply_styles_to_table(soup)
-    return str(soup)
+    return cached_convert_readme(markdown_text, no_images, normalize)
 
 
-def get_readme(new_files: list[Path], no_images: bool = False) -> str:
+def get_readme(new_files: list[Path], no_images: bool = False, normalize: bool = False) -> str:
     """Parses the first README.md found in the new files and returns an html-formatted string"""
-    return next((readme_html(ZipFile(file), no_images) for file in new_files if README in ZipFile(file).namelist()), "")
+    for file in new_files:
+        with ZipFile(file) as build:
+            if README in build.NameToInfo:
+                return readme_html(build, no_images, normalize)
+    return ""
 
 
 def get_build(file_path: PurePath, env_file: str) -> Path:
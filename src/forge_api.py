@@ -2,14 +2,15 @@
 
 import logging
 import time
+from collections.abc import Callable
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
+import orjson
 import requestium
-from bs4 import BeautifulSoup
-from bs4.element import NavigableString
-from selenium.common.exceptions import TimeoutException
+from lxml import etree, html as lhtml
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as EC
@@ -18,6 +19,37 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from src.dropzone import DropzoneErrorHandling, add_file_to_dropzone
 
+CSRF_TOKEN_XPATH = etree.XPath("//meta[@name='csrf-token']/@content")
+
+USERNAME_FIELD: tuple[str, str] = (By.NAME, "vb_login_username")
+PASSWORD_FIELD: tuple[str, str] = (By.NAME, "vb_login_password")
+LOGIN_BUTTON: tuple[str, str] = (By.CSS_SELECTOR, "a.registerbtn")
+LOGIN_FAILED_MESSAGE: tuple[str, str] = (By.CSS_SELECTOR, "div.blockrow.restore")
+ITEMS_PER_PAGE_SELECT: tuple[str, str] = (By.NAME, "items-table_length")
+ITEM_LINK_SELECTOR: str = "a[data-item-id='{item_id}']"
+SUBMIT_BUILD_BUTTON: tuple[str, str] = (By.ID, "submit-build-button")
+MANAGE_ITEM_TAB: tuple[str, str] = (By.ID, "manage-item-tab")
+SAVE_ITEM_BUTTON: tuple[str, str] = (By.ID, "save-item-button")
+DESCRIPTION_EDITOR_SELECTOR: str = "#manage-item .note-editable"
+REPLACE_EDITOR_CONTENT_SCRIPT: str = """
+const editor = document.querySelector(arguments[0]);
+if (editor === null) {
+    return false;
+}
+editor.innerHTML = arguments[1];
+editor.dispatchEvent(new Event("input", { bubbles: true }));
+return true;
+"""
+
+
+def navigated_away_from(url: str) -> Callable[[WebDriver], bool]:
+    """An expectation that the browser has left the page at url and finished loading whichever page it went to"""
+
+    def _predicate(driver: WebDriver) -> bool:
+        return driver.current_url != url and driver.execute_script("return document.readyState;") == "complete"
+
+    return _predicate
+
 
 class ForgeTransactionType(Enum):
     """Constants representing the strings used to represent each type of transaction for a Forge item"""
@@ -61,14 +93,15 @@ class ForgeCredentials:
 
     @staticmethod
     def get_csrf_token(session: requestium.Session, urls: ForgeURLs) -> str | None:
+        """Retrieve the CSRF token from the manage-craft page's meta tags, returning None if it is not found"""
         response = session.get(
             urls.MANAGE_CRAFT,
         )
-        soup = BeautifulSoup(response.content, "html.parser")
-        token_element = soup.find(attrs={"name": "csrf-token"})
-        if not token_element or isinstance(token_element, NavigableString):
-            return str(token_element)
-        return str(token_element.get("content"))
+        try:
+            tokens = CSRF_TOKEN_XPATH(lhtml.fromstring(response.content))
+        except etree.ParserError:
+            return None
+        return str(tokens[0]) if isinstance(tokens, list) and tokens else None
 
 
 @dataclass(frozen=True)
@@ -79,31 +112,52 @@ class ForgeItem:
     item_id: str
     timeout: float
 
+    @staticmethod
+    def is_logged_in(session: requestium.Session, urls: ForgeURLs) -> bool:
+        """Check whether this session has already logged in and can still reach manage-craft, without loading the login page"""
+        if "X-CSRF-TOKEN" not in session.headers:
+            return False
+        response = session.get(urls.MANAGE_CRAFT, allow_redirects=False)
+        return response.status_code == 200
+
     def login(self, session: requestium.Session, urls: ForgeURLs) -> None:
         """Open manage-craft and login if prompted"""
+        if self.is_logged_in(session, urls):
+            logging.info("Already logged in")
+            return
+
         session.driver.get(urls.FORGE_LOGIN)
 
         try:
-            username_field = WebDriverWait(session.driver, self.timeout).until(EC.element_to_be_clickable((By.NAME, "vb_login_username")))
-            password_field = WebDriverWait(session.driver, self.timeout).until(EC.element_to_be_clickable((By.NAME, "vb_login_password")))
-            time.sleep(0.25)
+            username_field = WebDriverWait(session.driver, self.timeout).until(EC.element_to_be_clickable(USERNAME_FIELD))
+            try:
+                password_field = session.driver.find_element(*PASSWORD_FIELD)  # same form, so already rendered
+            except NoSuchElementException as e:
+                raise TimeoutException("No password field found next to the username field.") from e
             username_field.send_keys(self.creds.username)
             password_field.send_keys(self.creds.password)
-            login_button = WebDriverWait(session.driver, self.timeout).until(EC.element_to_be_clickable((By.XPATH, "//a[@class='registerbtn']")))
+            login_button = WebDriverWait(session.driver, self.timeout).until(EC.element_to_be_clickable(LOGIN_BUTTON))
+            login_page_url = session.driver.current_url
             login_button.click()
-            time.sleep(0.25)
 
             try:
-                WebDriverWait(session.driver, self.timeout).until(EC.presence_of_element_located((By.XPATH, "//div[@class='blockrow restore']")))
-                raise Exception(f"Attempted login as {self.creds.username} was unsuccessful")
+                WebDriverWait(session.driver, self.timeout).until(navigated_away_from(login_page_url))
             except TimeoutException:
-                logging.info("Logged in as %s", self.creds.username)
-                session.transfer_driver_cookies_to_session(copy_user_agent=True)
-                session.headers.update({"X-CSRF-TOKEN": self.creds.get_csrf_token(session, urls)})
+                pass  # no new page was loaded, so the failure message can only be on the login page itself
+            if session.driver.find_elements(*LOGIN_FAILED_MESSAGE):
+                raise Exception(f"Attempted login as {self.creds.username} was unsuccessful")
+
+            logging.info("Logged in as %s", self.creds.username)
+            session.transfer_driver_cookies_to_session(copy_user_agent=True)
+            csrf_token = self.creds.get_csrf_token(session, urls)
+            if csrf_token is None:
+                logging.warning("No CSRF token found at %s", urls.MANAGE_CRAFT)
+            else:
+                session.headers.update({"X-CSRF-TOKEN": csrf_token})
 
         except TimeoutException:
             try:
-                WebDriverWait(session.driver, self.timeout).until(EC.presence_of_element_located((By.NAME, "items-table_length")))
+                WebDriverWait(session.driver, self.timeout).until(EC.presence_of_element_located(ITEMS_PER_PAGE_SELECT))
                 logging.info("Already logged in")
             except TimeoutException as e:
                 raise TimeoutException("No username or password field found, or login button is not clickable.") from e
@@ -113,7 +167,7 @@ class ForgeItem:
         driver.get(urls.MANAGE_CRAFT)
 
         try:
-            items_per_page = Select(WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable((By.NAME, "items-table_length"))))
+            items_per_page = Select(WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable(ITEMS_PER_PAGE_SELECT)))
             items_per_page.select_by_visible_text("100")
         except TimeoutException as e:
             raise TimeoutException("Could not load the Manage Craft page!") from e
@@ -121,7 +175,9 @@ class ForgeItem:
     def open_item_page(self, driver: WebDriver) -> None:
         """Open the management page for a specific forge item, raising an exception if a link matching the item_id isn't found."""
         try:
-            item_link = WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable((By.XPATH, f"//a[@data-item-id='{self.item_id}']")))
+            item_link = WebDriverWait(driver, self.timeout).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, ITEM_LINK_SELECTOR.format(item_id=self.item_id)))
+            )
             item_link.click()
         except TimeoutException as e:
             raise TimeoutException(f"Could not find item page, is {self.item_id} the right FORGE_ITEM_ID?") from e
@@ -146,7 +202,7 @@ class ForgeItem:
         for build in new_builds:
             add_file_to_dropzone(driver, self.timeout, build)
 
-        submit_button = WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable((By.ID, "submit-build-button")))
+        submit_button = WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable(SUBMIT_BUILD_BUTTON))
         submit_button.click()
 
         dropzone_errors = DropzoneErrorHandling(driver, self.timeout)
@@ -159,7 +215,7 @@ class ForgeItem:
         """Retrieve a list of sales for this Forge item, filter it by item_id and return the filtered list."""
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         response = session.post(urls.API_SALES, data=f"draw=1&length={limit_count}", headers=headers)
-        sales = response.json()["data"]
+        sales = orjson.loads(response.content)["data"]
 
         def is_sale_type(sale, sale_type: ForgeTransactionType):
             return sale["item_id"] == self.item_id and sale["transaction_type_id"] == sale_type.value
@@ -174,7 +230,7 @@ class ForgeItem:
         response = session.post(
             f"{urls.API_CRAFTER_ITEMS}/{self.item_id}/builds/data-table",
         )
-        return response.json()["data"]
+        return orjson.loads(response.content)["data"]
 
     def set_build_channel(self, session: requestium.Session, urls: ForgeURLs, build_id: str, channel: ForgeReleaseChannel) -> bool:
         """Sets the build channel of this Forge item to the specified value, returning True on 200 OK"""
@@ -186,19 +242,16 @@ class ForgeItem:
     def replace_description(self, driver: WebDriver, description_text: str) -> None:
         """Replaces the existing item description with a new HTML-formatted full description"""
         driver.execute_script("window.scrollTo(0, document.body.scrollTop);")
-        uploads_tab = WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable((By.XPATH, "//a[@id='manage-item-tab']")))
+        uploads_tab = WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable(MANAGE_ITEM_TAB))
         uploads_tab.click()
 
-        submit_button = WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable((By.ID, "save-item-button")))
+        submit_button = WebDriverWait(driver, self.timeout).until(EC.element_to_be_clickable(SAVE_ITEM_BUTTON))
 
-        description_field = driver.find_element(By.XPATH, "//div[@id='manage-item']").find_element(By.CLASS_NAME, "note-editable")
-        description_field.clear()
-        logging.info("Forge item description cleared")
-        driver.execute_script("arguments[0].innerHTML = arguments[1];", description_field, description_text)
-        time.sleep(0.25)
+        if not driver.execute_script(REPLACE_EDITOR_CONTENT_SCRIPT, DESCRIPTION_EDITOR_SELECTOR, description_text):
+            raise NoSuchElementException(f"No item description editor found at {DESCRIPTION_EDITOR_SELECTOR}")
 
         submit_button.click()
-        time.sleep(0.25)
+        time.sleep(0.25)  # the save request has no page element to wait on, so give it a moment before the driver can be closed
         logging.info("Forge item description uploaded")
 
     def update_description(self, session: requestium.Session, urls: ForgeURLs, description: str) -> None:
@@ -7,7 +7,10 @@ from pathlib import Path, PurePath
 
 import requestium
 from dotenv import load_dotenv
+from requests import Session
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
+from urllib3.util.retry import Retry
 
 import src.build_processing as build_processing
 from src.forge_api import ForgeItem, ForgeCredentials, ForgeURLs, ForgeReleaseChannel
@@ -21,6 +24,10 @@ CHROME_ARGS: list[str] = [
     "--headless=new",
     "--window-size=1280,1024",
 ]
+CHROME_PREFS: dict[str, int] = {
+    "profile.managed_default_content_settings.images": 2,  # don't download images, they are never used
+}
+RETRY_STATUS_CODES: list[int] = [502, 503, 504]
 
 
 def configure_headless_chrome() -> webdriver.ChromeOptions:
@@ -28,9 +35,17 @@ def configure_headless_chrome() -> webdriver.ChromeOptions:
     options = webdriver.ChromeOptions()
     for arg in CHROME_ARGS:
         options.add_argument(arg)
+    options.add_experimental_option("prefs", CHROME_PREFS)
     return options
 
 
+def configure_session_retries(session: Session) -> Session:
+    """Mount a pooled adapter that retries Forge requests after connection failures or transient gateway errors"""
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=RETRY_STATUS_CODES, allowed_methods=None, raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+    return session
+
+
 def construct_objects() -> tuple[list[Path], ForgeItem, ForgeURLs]:
     file_names = os.environ.get("FG_UL_FILE") or input("Files to include in build (comma-separated and within project folder): ")
     new_files = [build_processing.get_build(PurePath(__file__).parents[1], file) for file in file_names.split(",")]
@@ -49,6 +64,7 @@ def main() -> None:
     new_files, item, urls = construct_objects()
 
     with requestium.Session(driver=webdriver.Chrome(options=configure_headless_chrome())) as s:
+        configure_session_retries(s)
         item.login(s, urls)
         if os.environ.get("FG_GRAPH_SALES", "FALSE") == "TRUE":
             graph_users(item.get_sales(s, urls))
@@ -56,7 +72,11 @@ def main() -> None:
             channel = ForgeReleaseChannel[os.environ.get("FG_RELEASE_CHANNEL", "LIVE").upper()]
             item.upload_and_publish(s, urls, new_files, channel)
         if os.environ.get("FG_README_UPDATE", "FALSE") == "TRUE":
-            readme_text = build_processing.get_readme(new_files, os.environ.get("FG_README_NO_IMAGES", "FALSE") == "TRUE")
+            readme_text = build_processing.get_readme(
+                new_files,
+                os.environ.get("FG_README_NO_IMAGES", "FALSE") == "TRUE",
+                os.environ.get("FG_README_NORMALIZE", "FALSE") == "TRUE",
+            )
             item.update_description(s, urls, readme_text)
 
 
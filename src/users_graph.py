@@ -1,3 +1,4 @@
+import functools
 import tempfile
 
 import matplotlib.pyplot as plt
@@ -10,13 +11,17 @@ from matplotlib import rcParams
 FONT_URL = "https://github.com/google/fonts/raw/main/ofl/lexend/Lexend%5Bwght%5D.ttf?raw=true"
 
 
-with tempfile.NamedTemporaryFile(delete=False, suffix=".ttf") as tmp_font:
-    tmp_font.write(requests.get(FONT_URL).content)
-    font_manager.fontManager.addfont(tmp_font.name)
-    rcParams["font.family"] = "Lexend"
+@functools.cache
+def load_font() -> None:
+    """Download the Lexend font and make it the default, only once and only when a graph is actually drawn"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".ttf") as tmp_font:
+        tmp_font.write(requests.get(FONT_URL).content)
+        font_manager.fontManager.addfont(tmp_font.name)
+        rcParams["font.family"] = "Lexend"
 
 
 def graph_users(sales: list[dict[str, (str | int | None)]]) -> None:
+    load_font()
     sales_df = pd.DataFrame(sales)
     sales_df["created_at"] = pd.to_datetime(sales_df["created_at"])
     sales_df.set_index("created_at", inplace=True)
@@ -15,11 +15,13 @@ TEST_ELEMENTS = [
     (By.CLASS_NAME, "dz-hidden-input"),
     (By.CLASS_NAME, "dz-upload"),
 ]
+WEBELEMENT_SPEC = dir(WebElement)
+CHROME_SPEC = dir(webdriver.Chrome)
 
 
 def mock_element() -> MagicMock:
     """Construct a mock WebElement"""
-    element = MagicMock(spec=WebElement)
+    element = MagicMock(spec=WEBELEMENT_SPEC)
     element.click.return_value = None
     element.is_displayed.return_value = True
     element.send_keys.return_value = None
@@ -43,7 +45,7 @@ def find_elements(by, value) -> list[Optional[MagicMock]]:
 def test_add_file_to_dropzone() -> None:
     """Ensure that element location calls are made correctly"""
 
-    mock_driver = MagicMock(spec=webdriver.Chrome)
+    mock_driver = MagicMock(spec=CHROME_SPEC)
     mock_driver.find_element.side_effect = find_element
     mock_driver.find_elements.side_effect = find_elements
 
@@ -63,7 +65,7 @@ def test_add_file_to_dropzone_timeout() -> None:
             return mock_element()
         return None
 
-    mock_driver = MagicMock(spec=webdriver.Chrome)
+    mock_driver = MagicMock(spec=CHROME_SPEC)
     mock_driver.find_element.side_effect = find_element_unsuccessful
     mock_driver.find_elements.side_effect = find_elements
 
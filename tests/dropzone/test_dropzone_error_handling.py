@@ -9,9 +9,13 @@ from selenium.webdriver.remote.webelement import WebElement
 from src.dropzone import DropzoneErrorHandling, DropzoneException, LongUploadException, ToastErrorException
 
 
+WEBELEMENT_SPEC = dir(WebElement)
+CHROME_SPEC = dir(webdriver.Chrome)
+
+
 def mock_element() -> MagicMock:
     """Construct a mock WebElement"""
-    element = MagicMock(spec=WebElement)
+    element = MagicMock(spec=WEBELEMENT_SPEC)
     element.find_elements.return_value = [mock_element, mock_element]
     return element
 
@@ -28,7 +32,7 @@ def test_check_report_toast_error() -> None:
             return element
         return None
 
-    mock_driver = MagicMock(spec=webdriver.Chrome)
+    mock_driver = MagicMock(spec=CHROME_SPEC)
     mock_driver.find_element.side_effect = find_element
 
     with pytest.raises(ToastErrorException, match=error_text):
@@ -52,7 +56,7 @@ def test_check_report_dropzone_upload_error() -> None:
             return element
         return None
 
-    mock_driver = MagicMock(spec=webdriver.Chrome)
+    mock_driver = MagicMock(spec=CHROME_SPEC)
     mock_driver.find_element.side_effect = find_element
 
     with pytest.raises(DropzoneException, match=error_text):
@@ -75,7 +79,7 @@ def test_check_report_upload_percentage() -> None:
             return element
         return None
 
-    mock_driver = MagicMock(spec=webdriver.Chrome)
+    mock_driver = MagicMock(spec=CHROME_SPEC)
     mock_driver.find_element.side_effect = find_element
 
     with pytest.raises(LongUploadException, match=error_text):
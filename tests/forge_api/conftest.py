@@ -0,0 +1,22 @@
+import pytest
+
+from src.forge_api import ForgeCredentials, ForgeItem, ForgeURLs
+from .factories import ForgeCredentialsFactory
+
+
+@pytest.fixture(scope="session")
+def creds() -> ForgeCredentials:
+    """One set of random credentials is enough for tests that don't care about their values"""
+    return ForgeCredentialsFactory.build()
+
+
+@pytest.fixture(scope="session")
+def item(creds: ForgeCredentials) -> ForgeItem:
+    """A ForgeItem with a short timeout so that waits which are expected to expire don't slow the tests down"""
+    return ForgeItem(creds, "1337", 1)
+
+
+@pytest.fixture(scope="session")
+def urls() -> ForgeURLs:
+    """ForgeURLs is a frozen set of constants, so every test can share one instance"""
+    return ForgeURLs()
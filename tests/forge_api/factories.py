@@ -0,0 +1,9 @@
+from polyfactory.factories import DataclassFactory
+
+from src.forge_api import ForgeCredentials
+
+
+class ForgeCredentialsFactory(DataclassFactory[ForgeCredentials]):
+    """Represents a ForgeCredentials object for the purposes of testing ForgeItem objects"""
+
+    __model__ = ForgeCredentials
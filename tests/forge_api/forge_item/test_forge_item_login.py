@@ -1,70 +1,154 @@
-import os
-import sys
+import html
+import re
 from typing import Optional
 from unittest.mock import MagicMock, call
 
+import pytest
 import requestium
 from requests.structures import CaseInsensitiveDict
-from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
 from src.forge_api import ForgeItem, ForgeURLs
-from ..test_forge_credentials import ForgeCredentialsFactory
 
 TEST_CALLS = [
     (By.NAME, "vb_login_username"),
     (By.NAME, "vb_login_password"),
-    (By.XPATH, "//a[@class='registerbtn']"),
+    (By.CSS_SELECTOR, "a.registerbtn"),
 ]
+TEST_LOCATORS = frozenset(TEST_CALLS)
+LOGIN_FAILED_LOCATOR = (By.CSS_SELECTOR, "div.blockrow.restore")
+WEBELEMENT_SPEC = dir(WebElement)
+
+
+def locate_elements(driver: MagicMock, element: MagicMock, locators: frozenset[tuple[str, str]]) -> None:
+    """Have the driver find element for each of the locators and behave like selenium for anything else"""
+
+    def find_element(by: str, value: str) -> MagicMock:
+        if (by, value) in locators:
+            return element
+        raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+
+    driver.find_element.side_effect = find_element
+    driver.find_elements.side_effect = lambda by, value: [element] if (by, value) in locators else []
 
 
 def mock_element() -> MagicMock:
     """Construct a mock WebElement"""
-    element = MagicMock(spec=WebElement)
+    element = MagicMock(spec=WEBELEMENT_SPEC)
     element.click.return_value = None
     element.is_displayed.return_value = True
     element.send_keys.return_value = None
     return element
 
 
-def find_element(by: str, value: str) -> Optional[MagicMock]:
-    """Return a mock_element if the (by, value) pair isn't found in TEST_ELEMENTS"""
-    if (by, value) in TEST_CALLS:
-        return mock_element()
-    return None
-
-
-def test_csrf_extraction() -> None:
-    mock_session = MagicMock(spec=requestium.Session)
-    mock_session.headers = MagicMock(spec=CaseInsensitiveDict)
-    mock_session.driver = MagicMock(spec=webdriver.Chrome)
-    mock_session.driver.find_element.side_effect = find_element
-    mock_session.get.return_value.content = """
-        <html><head><meta name='csrf-token' content='2343c8fd56djfkl65f7ea74d518e19598ecb8150a84653a1c66d6a724bea39fb'></head></html>
-    """
-
-    creds = ForgeCredentialsFactory.build()
-    item = ForgeItem(creds, "1337", 1)
-    assert item.creds.get_csrf_token(mock_session, ForgeURLs()) == "2343c8fd56djfkl65f7ea74d518e19598ecb8150a84653a1c66d6a724bea39fb"
-
-
-def test_forge_item_login() -> None:
-    mock_session = MagicMock(spec=requestium.Session)
-    mock_session.headers = MagicMock(spec=CaseInsensitiveDict)
-    mock_session.driver = MagicMock(spec=webdriver.Chrome)
-    mock_session.driver.find_element.side_effect = find_element
-    mock_session.get.return_value.content = """
-        <html><head><meta name='csrf-token' content='2343c8fd56djfkl65f7ea74d518e19598ecb8150a84653a1c66d6a724bea39fb'></head></html>
-    """
-
-    creds = ForgeCredentialsFactory.build()
-    item = ForgeItem(creds, "1337", 1)
-    item.login(mock_session, ForgeURLs())
-    expected_find_element = [call(by, value) for (by, value) in TEST_CALLS]
-    expected_find_element.append(call(By.XPATH, "//div[@class='blockrow restore']"))  # login failure message
-    expected_find_element.append(call(By.XPATH, "//div[@class='blockrow restore']"))  # login failure message
-    expected_find_element.append(call(By.XPATH, "//div[@class='blockrow restore']"))  # login failure message
-    if os.name == "nt" and not sys.version_info.minor >= 13:
-        expected_find_element.append(call(By.XPATH, "//div[@class='blockrow restore']"))  # login failure message
-    assert mock_session.driver.find_element.mock_calls == expected_find_element
+CSRF_TOKEN = "2343c8fd56djfkl65f7ea74d518e19598ecb8150a84653a1c66d6a724bea39fb"
+
+
+def csrf_page(token: str) -> bytes:
+    """Build the response body of a page whose meta tags carry a CSRF token"""
+    return f"<html><head><meta name='csrf-token' content='{html.escape(token)}'></head></html>".encode()
+
+
+@pytest.fixture
+def element() -> MagicMock:
+    """A single mock WebElement returned for every login form locator in a test"""
+    return mock_element()
+
+
+@pytest.fixture
+def mock_session(element: MagicMock) -> MagicMock:
+    """Construct a mock requestium Session whose driver finds the login form and whose responses carry a CSRF token"""
+    session = MagicMock(spec=requestium.Session)
+    session.headers = CaseInsensitiveDict()
+    session.driver = MagicMock()
+    locate_elements(session.driver, element, TEST_LOCATORS)
+    session.get.return_value.content = csrf_page(CSRF_TOKEN)
+    return session
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (csrf_page(CSRF_TOKEN), CSRF_TOKEN),
+        ("<html><head><meta name='description' content='Manage Craft'></head></html>", None),
+        (b"", None),
+        (f"<meta name='csrf-token' content='{CSRF_TOKEN}'>".encode(), CSRF_TOKEN),
+    ],
+    ids=["present", "missing", "empty_response", "bytes_fragment"],
+)
+def test_csrf_extraction(mock_session: MagicMock, content: str | bytes, expected: Optional[str], item: ForgeItem, urls: ForgeURLs) -> None:
+    mock_session.get.return_value.content = content
+    assert item.creds.get_csrf_token(mock_session, urls) == expected
+
+
+@pytest.mark.parametrize(
+    "token",
+    ["abc123", "xyz789-token", "special!@#$%chars", "quotes'\"&<tags>"],
+    ids=["simple", "hyphen", "specials", "markup"],
+)
+def test_csrf_extraction_token_shapes(mock_session: MagicMock, token: str, item: ForgeItem, urls: ForgeURLs) -> None:
+    """Ensure that tokens come back exactly as they were written into the page, whatever characters they contain"""
+    mock_session.get.return_value.content = csrf_page(token)
+    assert item.creds.get_csrf_token(mock_session, urls) == token
+
+
+def test_forge_item_login(mock_session: MagicMock, item: ForgeItem, urls: ForgeURLs) -> None:
+    item.login(mock_session, urls)
+    assert mock_session.driver.find_element.mock_calls == [call(by, value) for (by, value) in TEST_CALLS]
+    mock_session.driver.find_elements.assert_called_once_with(*LOGIN_FAILED_LOCATOR)  # login failure message, checked once
+    assert mock_session.headers["X-CSRF-TOKEN"] == CSRF_TOKEN
+
+
+def test_forge_item_login_session_still_valid(mock_session: MagicMock, item: ForgeItem, urls: ForgeURLs) -> None:
+    mock_session.headers = CaseInsensitiveDict({"X-CSRF-TOKEN": CSRF_TOKEN})
+    mock_session.get.return_value.status_code = 200
+
+    item.login(mock_session, urls)
+    mock_session.get.assert_called_once_with(urls.MANAGE_CRAFT, allow_redirects=False)
+    mock_session.driver.get.assert_not_called()
+
+
+def test_forge_item_login_session_expired(mock_session: MagicMock, item: ForgeItem, urls: ForgeURLs) -> None:
+    """Ensure that a session the Forge has ended, which redirects manage-craft instead of loading it, logs in again through the login page"""
+    mock_session.headers = CaseInsensitiveDict({"X-CSRF-TOKEN": "expired-token"})
+    mock_session.get.return_value.status_code = 302
+
+    item.login(mock_session, urls)
+    mock_session.get.assert_any_call(urls.MANAGE_CRAFT, allow_redirects=False)
+    mock_session.driver.get.assert_called_once_with(urls.FORGE_LOGIN)
+    assert mock_session.driver.find_element.mock_calls == [call(by, value) for (by, value) in TEST_CALLS]
+    assert mock_session.headers["X-CSRF-TOKEN"] == CSRF_TOKEN
+
+
+def test_forge_item_login_leaves_login_page(mock_session: MagicMock, element: MagicMock, item: ForgeItem, urls: ForgeURLs) -> None:
+    """Ensure that a login which navigates to a new page is accepted without waiting for the failure message to time out"""
+    mock_session.driver.current_url = urls.FORGE_LOGIN
+    mock_session.driver.execute_script.return_value = "complete"
+    element.click.side_effect = lambda: setattr(mock_session.driver, "current_url", urls.MANAGE_CRAFT)
+
+    item.login(mock_session, urls)
+    assert mock_session.driver.find_element.mock_calls == [call(by, value) for (by, value) in TEST_CALLS]
+    mock_session.driver.find_elements.assert_called_once_with(*LOGIN_FAILED_LOCATOR)  # login failure message, checked once
+    mock_session.transfer_driver_cookies_to_session.assert_called_once_with(copy_user_agent=True)
+
+
+def test_forge_item_login_unsuccessful(mock_session: MagicMock, element: MagicMock, item: ForgeItem, urls: ForgeURLs) -> None:
+    """Ensure that an exception is raised if the page loaded after submitting the login form shows the failure message"""
+    locate_elements(mock_session.driver, element, TEST_LOCATORS | {LOGIN_FAILED_LOCATOR})
+    element.click.side_effect = lambda: setattr(mock_session.driver, "current_url", f"{urls.FORGE_LOGIN}?do=login")
+    mock_session.driver.execute_script.return_value = "complete"
+
+    with pytest.raises(Exception, match=re.escape(f"Attempted login as {item.creds.username} was unsuccessful")):
+        item.login(mock_session, urls)
+    mock_session.transfer_driver_cookies_to_session.assert_not_called()
+
+
+def test_forge_item_login_missing_password_field(mock_session: MagicMock, element: MagicMock, item: ForgeItem, urls: ForgeURLs) -> None:
+    """Ensure that a login form without a password field is reported as a TimeoutException rather than a selenium lookup error"""
+    locate_elements(mock_session.driver, element, TEST_LOCATORS - {(By.NAME, "vb_login_password")})
+
+    with pytest.raises(TimeoutException, match="No username or password field found"):
+        item.login(mock_session, urls)
+    element.send_keys.assert_not_called()
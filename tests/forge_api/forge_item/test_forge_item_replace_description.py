@@ -0,0 +1,33 @@
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from src.forge_api import DESCRIPTION_EDITOR_SELECTOR, REPLACE_EDITOR_CONTENT_SCRIPT, ForgeItem
+
+
+def mock_driver(editor_found: bool) -> MagicMock:
+    """Construct a mock driver whose tabs and buttons are clickable and whose script reports whether the editor was found"""
+    driver = MagicMock()
+    driver.find_element.return_value.is_displayed.return_value = True
+    driver.find_element.return_value.is_enabled.return_value = True
+    driver.execute_script.return_value = editor_found
+    return driver
+
+
+def test_replace_description(item: ForgeItem) -> None:
+    """Ensure that the description is written into the editor in one script call before the item is saved"""
+    driver = mock_driver(editor_found=True)
+
+    item.replace_description(driver, "<p>New description</p>")
+    driver.execute_script.assert_any_call(REPLACE_EDITOR_CONTENT_SCRIPT, DESCRIPTION_EDITOR_SELECTOR, "<p>New description</p>")
+    assert driver.find_element.return_value.click.call_count == 2  # the manage item tab, then the save button
+
+
+def test_replace_description_missing_editor(item: ForgeItem) -> None:
+    """Ensure that a missing description editor raises NoSuchElementException instead of a javascript error"""
+    driver = mock_driver(editor_found=False)
+
+    with pytest.raises(NoSuchElementException, match="No item description editor found"):
+        item.replace_description(driver, "<p>New description</p>")
+    assert driver.find_element.return_value.click.call_count == 1  # the item is never saved
@@ -1,17 +1,10 @@
 from dataclasses import FrozenInstanceError
 
 import pytest
-from polyfactory.factories import DataclassFactory
 
 from src.forge_api import ForgeCredentials
 
 
-class ForgeCredentialsFactory(DataclassFactory[ForgeCredentials]):
-    """Represents a ForgeCredentials object for the purposes of testing ForgeItem objects"""
-
-    __model__ = ForgeCredentials
-
-
 def test_forge_credentials_creation() -> None:
     """Ensures that provided username and password are found in the ForgeCredentials object and that attempts at modifying values are not allowed"""
     user_string = "eugene"
@@ -1,8 +1,17 @@
+import pytest
+
 from src.forge_api import ForgeReleaseChannel
 
 
-def test_forge_urls() -> None:
-    """Ensure set values in ForgeURLs have not been changed"""
-    assert ForgeReleaseChannel.LIVE.value == "1"
-    assert ForgeReleaseChannel.TEST.value == "2"
-    assert ForgeReleaseChannel.NONE.value == "0"
+@pytest.mark.parametrize(
+    ("channel", "expected"),
+    [
+        (ForgeReleaseChannel.LIVE, "1"),
+        (ForgeReleaseChannel.TEST, "2"),
+        (ForgeReleaseChannel.NONE, "0"),
+    ],
+    ids=["live", "test", "none"],
+)
+def test_forge_release_channel_values(channel: ForgeReleaseChannel, expected: str) -> None:
+    """Ensure set values in ForgeReleaseChannel have not been changed"""
+    assert channel.value == expected
@@ -4,11 +4,23 @@ import pytest
 
 from src.forge_api import ForgeURLs
 
+URLS = ForgeURLs()
 
-def test_forge_urls() -> None:
+
+@pytest.mark.parametrize(
+    ("attribute", "expected"),
+    [
+        ("MANAGE_CRAFT", "https://forge.fantasygrounds.com/crafter/manage-craft"),
+        ("API_CRAFTER_ITEMS", "https://forge.fantasygrounds.com/api/crafter/items"),
+    ],
+    ids=["manage_craft", "api_crafter_items"],
+)
+def test_forge_urls(attribute: str, expected: str) -> None:
     """Ensure set values in ForgeURLs have not been changed"""
-    urls = ForgeURLs()
-    assert urls.MANAGE_CRAFT == "https://forge.fantasygrounds.com/crafter/manage-craft"
-    assert urls.API_CRAFTER_ITEMS == "https://forge.fantasygrounds.com/api/crafter/items"
+    assert getattr(URLS, attribute) == expected
+
+
+def test_forge_urls_frozen() -> None:
+    """Ensure that values in ForgeURLs can't be modified"""
     with pytest.raises(FrozenInstanceError):
-        urls.MANAGE_CRAFT = "https://www.ellingson-mineral.com/"  # type: ignore[misc]
+        URLS.MANAGE_CRAFT = "https://www.ellingson-mineral.com/"  # type: ignore[misc]
@@ -0,0 +1,210 @@
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+from lxml import html as lhtml
+
+from src.build_processing import (
+    README,
+    TABLE_CELL_STYLE,
+    TABLE_ROW_STYLES,
+    apply_styles_to_table,
+    clear_cache,
+    convert_readme,
+    get_readme,
+    readme_cache_dir,
+    replace_images_with_link,
+)
+
+README_TEXT = "# Test Item\n\nSome *new* features.\n"
+HEADER_ROW = f'<tr style="{TABLE_ROW_STYLES[0]}">'
+BODY_ROW = f'<tr style="{TABLE_ROW_STYLES[1]}">'
+CELL = f'<td style="{TABLE_CELL_STYLE}">'
+
+
+@pytest.fixture(autouse=True)
+def readme_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the README cache at a temporary folder and start each test with nothing cached"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    clear_cache()
+    return readme_cache_dir()
+
+
+@pytest.fixture(scope="session")
+def readme_zips(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A folder shared by the extension zips, which are only ever read"""
+    return tmp_path_factory.mktemp("readme_zips")
+
+
+@pytest.fixture(scope="session")
+def temp_zip_with_readme(readme_zips: Path) -> Path:
+    """Build an extension zip containing a README.md"""
+    zip_path = readme_zips / "with_readme.ext"
+    with ZipFile(zip_path, "w") as zf:
+        zf.writestr(README, README_TEXT)
+        zf.writestr("extension.xml", "<root />")
+    return zip_path
+
+
+@pytest.fixture(scope="session")
+def temp_zip_without_readme(readme_zips: Path) -> Path:
+    """Build an extension zip that does not contain a README.md"""
+    zip_path = readme_zips / "without_readme.ext"
+    with ZipFile(zip_path, "w") as zf:
+        zf.writestr("extension.xml", "<root />")
+    return zip_path
+
+
+CELL_STYLE = "border:1px solid #FFFFFF; padding:0.5em;"
+ODD_ROW_STYLE = "background-color: #000000; border:1px solid #FFFFFF;"
+EVEN_ROW_STYLE = "background-color: #1C1C1E; border:1px solid #FFFFFF;"
+
+
+@pytest.mark.parametrize(
+    ("html", "expected_td_styles", "expected_tr_styles"),
+    [
+        ("<table><tr><td>a</td><td>b</td></tr></table>", [CELL_STYLE] * 2, [ODD_ROW_STYLE]),
+        ("<table><tr><td>1</td></tr><tr><td>2</td></tr><tr><td>3</td></tr></table>", [CELL_STYLE] * 3, [ODD_ROW_STYLE, EVEN_ROW_STYLE, ODD_ROW_STYLE]),
+        ("<p>no tables here</p>", [], []),
+    ],
+    ids=["cells", "alternating_rows", "without_table"],
+)
+def test_apply_styles_to_table(html: str, expected_td_styles: list[str], expected_tr_styles: list[str]) -> None:
+    """Ensure that every table cell receives a border and padding and that row background colors alternate"""
+    result = apply_styles_to_table(lhtml.fragment_fromstring(html, create_parent="div"))
+    assert [td.get("style") for td in result.iter("td")] == expected_td_styles
+    assert [tr.get("style") for tr in result.iter("tr")] == expected_tr_styles
+
+
+@pytest.mark.parametrize(
+    ("html", "no_images", "expected"),
+    [
+        (
+            '<p><img src="https://example.com/a.png" alt="Alt text"> after</p>',
+            False,
+            '<div><p><a href="https://example.com/a.png">Alt text</a> after</p></div>',
+        ),
+        (
+            '<p><a href="https://example.com/"><img src="https://example.com/a.png" alt="Alt"></a></p>',
+            False,
+            '<div><p><a href="https://example.com/">Alt</a></p></div>',
+        ),
+        (
+            '<p><img src="https://example.com/a.png" alt="Alt text"></p>',
+            True,
+            '<div><p><a href="https://example.com/a.png"></a></p></div>',
+        ),
+    ],
+    ids=["image", "linked_image", "no_images"],
+)
+def test_replace_images_with_link(html: str, no_images: bool, expected: str) -> None:
+    """Ensure that images become links labelled with their alt text, or label the link around them, keeping any text that follows them"""
+    result = replace_images_with_link(lhtml.fragment_fromstring(html, create_parent="div"), no_images)
+    assert lhtml.tostring(result, encoding="unicode") == expected
+
+
+def test_convert_readme_drops_relative_images() -> None:
+    """Ensure that images without alt text that point to relative paths are removed entirely"""
+    html = convert_readme("Before ![](./images/screenshot.png) after\n")
+    assert "screenshot" not in html
+    assert "<a" not in html
+    assert "Before" in html
+    assert "after" in html
+
+
+@pytest.mark.parametrize(
+    ("markdown_text", "expected"),
+    [
+        ("Para\n\n![](./a.png)\n\nNext", "<p>Para</p>\n<p>Next</p>"),
+        ("Hi  \n![](./a.png)", "<p>Hi</p>"),
+        ("Hi\n![](./a.png)\nthere", "<p>Hi<br>\nthere</p>"),
+        ("# Title ![](./a.png)", "<h1>Title</h1>"),
+        ("[![](./a.png)](https://example.com/)\n\nNext", "<p>Next</p>"),
+        ("[![](./a.png)](https://example.com/) trailing text", "<p>trailing text</p>"),
+        (
+            "| a | b |\n|---|---|\n| ![](./a.png) | x |",
+            f"<table>\n<thead>\n{HEADER_ROW}\n<th>a</th>\n<th>b</th>\n</tr>\n</thead>\n<tbody>\n{BODY_ROW}\n{CELL}</td>\n{CELL}x</td>\n</tr>\n</tbody>\n</table>",
+        ),
+        (
+            "| ![](./a.png) | b |\n|---|---|\n| 1 | 2 |",
+            f"<table>\n<thead>\n{HEADER_ROW}\n<th></th>\n<th>b</th>\n</tr>\n</thead>\n<tbody>\n{BODY_ROW}\n{CELL}1</td>\n{CELL}2</td>\n</tr>\n</tbody>\n</table>",
+        ),
+        ("1. ![](./a.png)\n2. two", "<ol>\n<li>\n<li>two</li>\n</ol>"),  # lxml leaves out the optional end tag of an empty list item
+    ],
+    ids=["own_paragraph", "end_of_line", "own_line", "heading", "linked_image", "linked_image_before_text", "table_cell", "table_header", "list_item"],
+)
+@pytest.mark.parametrize("normalize", [False, True], ids=["raw", "normalized"])
+def test_convert_readme_drops_relative_images_cleanly(markdown_text: str, expected: str, normalize: bool) -> None:
+    """Ensure that removing a relative image leaves no empty paragraph, dangling line break, or stray whitespace behind, while table cells and list items keep their place"""
+    assert convert_readme(markdown_text, normalize=normalize) == expected
+
+
+def test_convert_readme_images_become_links() -> None:
+    """Ensure that markdown images are rendered as links to the image labelled with the alt text"""
+    assert convert_readme("![Alt text](https://example.com/a.png) after") == '<p><a href="https://example.com/a.png">Alt text</a> after</p>'
+    assert convert_readme("![Alt text](https://example.com/a.png)", no_images=True) == '<p><a href="https://example.com/a.png"></a></p>'
+
+
+def test_convert_readme_linked_image() -> None:
+    """Ensure that an image inside a link becomes the link text instead of a nested link"""
+    html = convert_readme("[![Badge](https://example.com/badge.svg)](https://example.com/)")
+    assert html == '<p><a href="https://example.com/">Badge</a></p>'
+
+
+def test_convert_readme_normalize() -> None:
+    """Ensure that opting in to mdformat normalization still produces the same html for well-formed markdown"""
+    assert convert_readme(README_TEXT, normalize=True) == convert_readme(README_TEXT)
+
+
+def test_get_readme_converts_markdown(temp_zip_with_readme: Path) -> None:
+    """Ensure that the README is converted to html"""
+    html = get_readme([temp_zip_with_readme])
+    assert "<h1>Test Item</h1>" in html
+    assert "<em>new</em>" in html
+
+
+def test_get_readme_is_cached(temp_zip_with_readme: Path, readme_cache: Path) -> None:
+    """Ensure that converted html is written to the cache folder and reused instead of converting again"""
+    html = get_readme([temp_zip_with_readme])
+    cached_files = list(readme_cache.glob("*.html"))
+    assert len(cached_files) == 1
+    assert cached_files[0].read_text(encoding="UTF-8") == html
+
+    clear_cache()
+    readme_cache.mkdir(parents=True)
+    cached_files[0].write_text("<p>cached</p>", encoding="UTF-8")
+    assert get_readme([temp_zip_with_readme]) == "<p>cached</p>"
+
+
+def test_get_readme_cache_leaves_no_temporary_files(temp_zip_with_readme: Path, readme_cache: Path) -> None:
+    """Ensure that html is written to a temporary file and moved into place, leaving only the finished cache file"""
+    get_readme([temp_zip_with_readme])
+    assert [file.suffix for file in readme_cache.iterdir()] == [".html"]
+
+
+def test_get_readme_unreadable_cache_is_a_miss(temp_zip_with_readme: Path, readme_cache: Path) -> None:
+    """Ensure that a corrupted cache file is converted again instead of raising"""
+    html = get_readme([temp_zip_with_readme])
+    cached_file = next(readme_cache.glob("*.html"))
+
+    clear_cache()
+    readme_cache.mkdir(parents=True)
+    cached_file.write_bytes(b"\xff\xfe not utf-8")
+    assert get_readme([temp_zip_with_readme]) == html
+
+
+def test_clear_cache(temp_zip_with_readme: Path, readme_cache: Path) -> None:
+    """Ensure that clearing the cache removes stored html"""
+    get_readme([temp_zip_with_readme])
+    clear_cache()
+    assert not readme_cache.exists()
+
+
+def test_get_readme_searches_multiple_files(temp_zip_without_readme: Path, temp_zip_with_readme: Path) -> None:
+    """Ensure that files without a README are skipped until one with a README is found"""
+    assert "<h1>Test Item</h1>" in get_readme([temp_zip_without_readme, temp_zip_with_readme])
+
+
+def test_get_readme_not_found(temp_zip_without_readme: Path) -> None:
+    """Ensure that an empty string is returned when none of the files contain a README"""
+    assert get_readme([temp_zip_without_readme]) == ""
@@ -1,16 +1,39 @@
+import pytest
+from selenium import webdriver
+
 from src.main import configure_headless_chrome
 
 
-def convert_args_to_dict(args):
-    return {key: value.split(",") if "," in value else value for key, value in (arg.split("=") for arg in args)}
+def convert_args_to_dict(args: list[str]) -> dict[str, str | list[str]]:
+    """Map each chrome argument to its value, splitting comma-separated values into a list and mapping bare flags to themselves"""
+    converted: dict[str, str | list[str]] = {}
+    for arg in args:
+        key, sep, value = arg.partition("=")
+        if not sep:
+            converted[key] = key
+        elif "," in value:
+            converted[key] = value.split(",")
+        else:
+            converted[key] = value
+    return converted
+
+
+@pytest.fixture(scope="module")
+def options() -> webdriver.ChromeOptions:
+    """Chrome options are only read by these tests, so build them once"""
+    return configure_headless_chrome()
 
 
-def test_configure_headless_chrome() -> None:
-    options = configure_headless_chrome()
+def test_configure_headless_chrome(options: webdriver.ChromeOptions) -> None:
     args = convert_args_to_dict(options.arguments)
     assert "--headless" in args  # headless mode is active
     assert args["--headless"] == "new"  # headless mode is using new mode
     assert "--remote-debugging-port" in args  # remote debugging is active
     assert "--window-size" in args
-    assert int(args["--window-size"][0]) > 1024  # window size is at least 1024 wide
-    assert int(args["--window-size"][1]) > 800  # window size is at least 800 tall
+    window_size = args["--window-size"]
+    assert int(window_size[0]) > 1024  # window size is at least 1024 wide
+    assert int(window_size[1]) > 800  # window size is at least 800 tall
+
+
+def test_configure_headless_chrome_blocks_images(options: webdriver.ChromeOptions) -> None:
+    assert options.experimental_options["prefs"]["profile.managed_default_content_settings.images"] == 2  # images are not loaded
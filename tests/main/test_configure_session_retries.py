@@ -0,0 +1,16 @@
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from src.forge_api import ForgeURLs
+from src.main import RETRY_STATUS_CODES, configure_session_retries
+
+
+def test_configure_session_retries() -> None:
+    """Ensure that requests to the Forge use an adapter that retries transient gateway errors for any request method"""
+    session = configure_session_retries(Session())
+    adapter = session.get_adapter(ForgeURLs().API_CRAFTER_ITEMS)
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.status_forcelist == RETRY_STATUS_CODES
+    assert adapter.max_retries.is_retry("POST", 503)
+    assert not adapter.max_retries.raise_on_status
@@ -1,18 +1,25 @@
 import os
 from pathlib import Path
 
+import pytest
+
 from src.forge_api import ForgeItem, ForgeURLs
 from src.main import construct_objects
 
 
-def test_construct_objects() -> None:
+@pytest.fixture(params=["README.md", "README.md,LICENSE"], ids=["single", "comma_separated"])
+def construct_env(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Provide every value construct_objects would otherwise prompt for, returning the build file names that were set"""
+    environ = {**os.environ, "FG_USER_NAME": "eugene", "FG_USER_PASS": "god", "FG_ITEM_ID": "7", "FG_UL_FILE": request.param}
+    monkeypatch.setattr(os, "environ", environ)
+    return request.param.split(",")
+
+
+def test_construct_objects(construct_env: list[str]) -> None:
     """Ensures that the object construction function provides objects of the right type in the right order"""
-    os.environ["FG_USER_NAME"] = "eugene"
-    os.environ["FG_USER_PASS"] = "god"
-    os.environ["FG_ITEM_ID"] = "7"
-    os.environ["FG_UL_FILE"] = "README.md"
-    new_file, item, urls = construct_objects()
-    assert isinstance(new_file, list)
-    assert isinstance(new_file[0], Path)
+    new_files, item, urls = construct_objects()
+    assert isinstance(new_files, list)
+    assert all(isinstance(new_file, Path) for new_file in new_files)
+    assert [new_file.name for new_file in new_files] == construct_env
     assert isinstance(item, ForgeItem)
     assert isinstance(urls, ForgeURLs)
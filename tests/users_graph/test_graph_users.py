@@ -0,0 +1,48 @@
+import importlib
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import matplotlib.pyplot as plt
+import pytest
+import requests
+
+SALES = [
+    {"created_at": "2024-01-02T10:00:00Z", "user_id": 1},
+    {"created_at": "2024-01-09T10:00:00Z", "user_id": 2},
+    {"created_at": "2024-01-23T10:00:00Z", "user_id": None},
+]
+
+
+@pytest.fixture
+def mock_get(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> MagicMock:
+    """Replace every network and file side effect of drawing a graph, and return the mock standing in for requests.get"""
+    mock_get = MagicMock()
+    mock_get.return_value.content = b"font"
+    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(plt.style, "use", MagicMock())
+    monkeypatch.setattr(plt, "savefig", MagicMock())
+    monkeypatch.delitem(sys.modules, "src.users_graph", raising=False)  # import a fresh copy whose font has never been loaded
+    return mock_get
+
+
+def test_import_makes_no_request(mock_get: MagicMock) -> None:
+    """Ensure that importing the module doesn't download the font"""
+    importlib.import_module("src.users_graph")
+    mock_get.assert_not_called()
+
+
+def test_graph_users_loads_font_once(mock_get: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Ensure that drawing graphs downloads the font the first time only and saves each graph"""
+    users_graph = importlib.import_module("src.users_graph")
+    monkeypatch.setattr(users_graph.font_manager.fontManager, "addfont", MagicMock())
+    monkeypatch.setattr(users_graph, "rcParams", {})
+
+    users_graph.graph_users(SALES)
+    users_graph.graph_users(SALES)
+    plt.close("all")
+
+    mock_get.assert_called_once_with(users_graph.FONT_URL)
+    assert plt.savefig.call_count == 2  # type: ignore[attr-defined]